@@ -3,42 +3,88 @@
 import abc
 import argparse
 import os
+import re
 import sys
-from typing import Protocol, TypeGuard, Generic, TypeVar
+from collections.abc import Callable, Mapping
+from functools import cache, lru_cache
+from types import MappingProxyType
+from typing import Any, Final, Generic, Protocol, TypeGuard, TypeVar
 
 T = TypeVar("T")
 
 class _MISSING:
+    __slots__ = ()
+    _instance: "_MISSING | None" = None
+
+    def __new__(cls) -> "_MISSING":  # noqa: PYI034
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
     def __bool__(self):
         return False
 
 
-MISSING = _MISSING()
+MISSING: Final = _MISSING()
 
 MaybeString = str | None | _MISSING
 
 CENSORED_WORDS = ["password", "passphrase", "token", "secret"]
 
+# Terminals that should not get colors unless asked for.
+_NO_COLOR_TERMS = frozenset({"xterm-mono", "dumb"})
+
+_MARKS_UTF = ("✓", "✗", "·")
+_MARKS_ASCII = ("+", "✗", "-")
+
+# Environment variables do not change while we build a parser, so read them all once, up front.
+_ENV_SNAPSHOT: Mapping[str, str] = MappingProxyType(dict(os.environ))
+
 # Mockable methods for interacting with the standard library.
 
 
 def get_environ(key: str, default: MaybeString = MISSING) -> MaybeString:
     """Get a variable from the environment."""
-    if key not in os.environ:
+    value = _ENV_SNAPSHOT.get(key)
+    if value is None:
         return default
-    return os.environ.get(key)
+    return value
+
+
+def refresh_env_cache() -> None:
+    """Take a new snapshot of the environment, such as after changing os.environ."""
+    global _ENV_SNAPSHOT  # noqa: PLW0603
+    _ENV_SNAPSHOT = MappingProxyType(dict(os.environ))
 
 
+def _clear_caches() -> None:
+    """Forget everything remembered about the environment and stdout."""
+    refresh_env_cache()
+    stdout_is_a_tty.cache_clear()
+    stdout_is_utf.cache_clear()
+    stdout_supports_unicode.cache_clear()
+    get_terminal.cache_clear()
+    _marks.cache_clear()
+    is_censored.cache_clear()
+    _use_cli_color.cache_clear()
+    guess_boolean.cache_clear()
+
+
+@cache
 def stdout_is_a_tty() -> bool:
     """Check if std is a tty."""
-    return sys.stdout.isatty()
+    isatty = getattr(sys.stdout, "isatty", None)
+    return bool(isatty and isatty())
 
 
+@cache
 def stdout_is_utf() -> bool:
     """Check stdout's reported encoding for the string UTF."""
-    return "UTF" in sys.stdout.encoding.upper()
+    encoding = getattr(sys.stdout, "encoding", None) or ""
+    return "UTF" in encoding.upper()
 
 
+@cache
 def stdout_supports_unicode() -> bool:
     """Guess if stdout likely supports Unicode or not."""
     if get_terminal() == "dumb":
@@ -46,6 +92,15 @@ def stdout_supports_unicode() -> bool:
     return stdout_is_utf()
 
 
+@cache
+def _marks() -> tuple[str, str, str]:
+    """Pick the true, false, and neutral markers that stdout can display."""
+    if stdout_is_utf():
+        return _MARKS_UTF
+    return _MARKS_ASCII
+
+
+@cache
 def get_terminal() -> MaybeString:
     """Get the value of the TERM environment variable."""
     return get_environ("TERM")
@@ -53,15 +108,17 @@ def get_terminal() -> MaybeString:
 
 def not_empty_string(value: MaybeString) -> TypeGuard[str]:
     """Verify that a variable represents a non-empty string."""
-    return value is not None and isinstance(value, str) and len(value.strip()) > 0
+    return isinstance(value, str) and bool(value) and not value.isspace()
+
+
+def _env_values(var_names: list[str]) -> list[tuple[str, MaybeString]]:
+    """Pair each environment variable we could fall back to with its value."""
+    return [(var_name, get_environ(var_name)) for var_name in var_names]
 
 
 def env_fallbacks(var_names: list[str]) -> dict[str, MaybeString]:
     """Check for the environment variable we could fall back to."""
-    fallbacks = {}
-    for var_name in var_names:
-        fallbacks[var_name] = get_environ(var_name)
-    return fallbacks
+    return dict(_env_values(var_names))
 
 
 def contains_any(
@@ -82,73 +139,120 @@ def contains_any(
     return any(fragment in whole_string for fragment in clean_fragments)
 
 
+@lru_cache(maxsize=256)
+def is_censored(k: str) -> bool:
+    """Check if an environment variable's name suggests that its value is a secret."""
+    return contains_any(k, CENSORED_WORDS, case_sensitive=False)
+
+
 def env_hint(k: str, v: MaybeString, prefix: str = "") -> str:
     """Make a hint for a value that can be derived from an environment variable."""
-    if v is None or isinstance(v, _MISSING):
+    if v is None or v is MISSING:
         v = "(not set)"
-    elif contains_any(k, CENSORED_WORDS, case_sensitive=False) and v:
+    elif v and is_censored(k):
         v = "*** REDACTED ***"
 
     return f"{prefix}{k}={v}"
 
 
-def add_argument(
-    parser: argparse.ArgumentParser, argument_help: str, name: str, var_names: list[str], fallback: str | None = None
-) -> None:
-    """Add an argument with fallback environment variables."""
-    dest = name.replace("-", "_")
-    fallbacks = env_fallbacks(var_names)
-    default = None
-    for v in fallbacks.values():
-        if v is not None:
-            default = v
-            break
-    if default is None:
-        default = fallback
+class _LazyHelp:
+    """Help text that is only built if argparse actually renders it."""
 
-    if stdout_is_utf():
-        true_mark = "✓"
-        dot_mark = "·"
-    else:
-        true_mark = "+"
-        dot_mark = "-"
+    __slots__ = ("_build", "_text")
+
+    def __init__(self, build: Callable[[], str]) -> None:
+        self._build = build
+        self._text: str | None = None
+
+    def __str__(self) -> str:
+        if self._text is None:
+            self._text = self._build()
+        return self._text
+
+    def __repr__(self) -> str:
+        return repr(str(self))
+
+    def __bool__(self) -> bool:
+        return bool(str(self))
+
+    def __len__(self) -> int:
+        return len(str(self))
 
+    def __contains__(self, item: str) -> bool:
+        return item in str(self)
+
+    def __add__(self, other: str) -> str:
+        return str(self) + other
+
+    def __mod__(self, params: object) -> str:
+        return str(self) % params
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        return getattr(str(self), name)
+
+
+def _build_argument_help(argument_help: str, fallbacks: list[tuple[str, MaybeString]], fallback: str | None) -> str:
+    """Explain where an argument's default comes from."""
+    true_mark, _, dot_mark = _marks()
     environment_variable_helps = []
     has_found_default = False
-    for k, v in fallbacks.items():
-        if v is not None and has_found_default is False:
+    for k, v in fallbacks:
+        if not has_found_default and v is not None and v is not MISSING:
+            has_found_default = True
             prefix = f"  {true_mark} $"
         else:
             prefix = f"  {dot_mark} $"
-        hint = env_hint(k, v, prefix)
-        has_found_default = v is not None
-        environment_variable_helps.append(hint)
+        environment_variable_helps.append(env_hint(k, v, prefix))
 
     help_texts = [argument_help]
-    metavar = None
-    if len(var_names) == 1:
-        metavar = var_names[0]
+    if len(fallbacks) == 1:
         environment_variable_help = environment_variable_helps[0].strip()
         help_texts.append(environment_variable_help)
     elif environment_variable_helps:
-        environment_variable_help = environment_variable_helps.pop(0).strip()
-        help_texts.append(f"Env: {environment_variable_help}")
-        help_texts.extend([f"     {e.strip()}" for e in environment_variable_helps])
+        first_help, *other_helps = environment_variable_helps
+        help_texts.append(f"Env: {first_help.strip()}")
+        help_texts.extend([f"     {e.strip()}" for e in other_helps])
     if fallback is not None:
         help_texts.append(f"default: {fallback}")
-    help_text = "\n".join(help_texts)
-    parser.add_argument(f"--{name}", dest=dest, metavar=metavar, required=False, default=default, help=help_text)
+    return "\n".join(help_texts)
+
+
+def add_argument(
+    parser: argparse.ArgumentParser, argument_help: str, name: str, var_names: list[str], fallback: str | None = None
+) -> None:
+    """Add an argument with fallback environment variables."""
+    dest = name.replace("-", "_")
+    fallbacks = _env_values(var_names)
+    default = next((v for _, v in fallbacks if v is not None and v is not MISSING), None)
+    if default is None:
+        default = fallback
+    metavar = None
+    if len(var_names) == 1:
+        metavar = var_names[0]
+    # argparse only turns help into a string when it renders --help, so skip the work otherwise.
+    help_text = _LazyHelp(lambda: _build_argument_help(argument_help, fallbacks, fallback))
+    parser.add_argument(
+        f"--{name}",
+        dest=dest,
+        metavar=metavar,
+        required=False,
+        default=default,
+        help=help_text,  # type: ignore[arg-type]
+    )
 
 
 class UseCliColor:
     """Precalculate some checks for if we should use colors or not."""
 
+    __slots__ = ("cli_color", "cli_color_force", "default_color", "is_tty", "no_color", "terminal")
+
     def __init__(self) -> None:
         self.no_color = get_environ("NO_COLOR")
         self.cli_color = get_environ("CLICOLOR")
         self.cli_color_force = get_environ("CLICOLOR_FORCE")
         self.terminal = get_terminal()
         self.is_tty = stdout_is_a_tty()
+        self.default_color = self.guess_if_color_is_default()
 
     def guess_if_color_is_default(self) -> bool:
         """Determine if we should use colors or not."""
@@ -156,7 +260,7 @@ class UseCliColor:
             default_color = False
         elif self.cli_color_force:
             default_color = True
-        elif self.terminal in {"xterm-mono", "dumb"}:
+        elif self.terminal in _NO_COLOR_TERMS:
             default_color = False
         elif self.cli_color:
             default_color = self.is_tty
@@ -165,29 +269,30 @@ class UseCliColor:
         return default_color
 
 
-def add_color_arguments(parser: argparse.ArgumentParser) -> None:
-    """Add colors arguments with default and explanations.
+@cache
+def _use_cli_color() -> UseCliColor:
+    """Share a single set of color checks for the whole process."""
+    return UseCliColor()
 
-    See: https://no-color.org/ and https://bixense.com/clicolors/
-    """
-    color_use_decider = UseCliColor()
+
+def _build_color_help(color_use_decider: UseCliColor) -> tuple[str, str]:
+    """Build the title and explanation for the colors argument group."""
     no_color_hint = env_hint("NO_COLOR", color_use_decider.no_color, "$")
     cli_color_force_hint = env_hint("CLICOLOR_FORCE", color_use_decider.cli_color_force, "$")
     cli_color_hint = env_hint("CLICOLOR", color_use_decider.cli_color, "$")
-    default_use_color = color_use_decider.guess_if_color_is_default()
     if color_use_decider.is_tty:
         is_tty_hint = "yes"
     else:
         is_tty_hint = "no"
 
     term_hint = env_hint("TERM", color_use_decider.terminal, "$")
-    if color_use_decider.terminal == {"xterm-mono", "dumb"}:
+    if color_use_decider.terminal in _NO_COLOR_TERMS:
         term_hint = f"{term_hint}: this TERM disables colors by default"
     elif not_empty_string(color_use_decider.terminal):
         term_hint = f"{term_hint}: this TERM probably allows colors"
     else:
         term_hint = f"{term_hint}: cannot guess this terminal's color capabilities"
-    if default_use_color:
+    if color_use_decider.default_color:
         default_color_hint = "Colors currently defaulting to on"
     else:
         default_color_hint = "Colors currently defaulting to off"
@@ -199,6 +304,17 @@ def add_color_arguments(parser: argparse.ArgumentParser) -> None:
      {term_hint}
 
 Force the color setting:""".rstrip()
+    return colors_title, colors_help
+
+
+def add_color_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add colors arguments with default and explanations.
+
+    See: https://no-color.org/ and https://bixense.com/clicolors/
+    """
+    color_use_decider = _use_cli_color()
+    default_use_color = color_use_decider.default_color
+    colors_title, colors_help = _build_color_help(color_use_decider)
 
     colors_group = parser.add_argument_group(colors_title, colors_help)
     colors = colors_group.add_mutually_exclusive_group(required=False)
@@ -218,9 +334,10 @@ Force the color setting:""".rstrip()
     )
 
 
+@cache
 def guess_boolean(value: MaybeString) -> bool:
     """Guess if a string represents truthiness or falsiness."""
-    if value is None or isinstance(value, _MISSING):
+    if value is None or value is MISSING:
         return False
     return f"{value}".lower() in {"true", "t", "y", "yes", "1"}
 
@@ -235,43 +352,27 @@ def add_boolean_argument(
     """Add two arguments, --thing and --no-thing, and optionally select a default."""
     help_texts = []
     dest = name.replace("-", "_")
-    fallbacks = env_fallbacks(var_names)
+    fallbacks = _env_values(var_names)
+    true_mark, false_mark, dot_mark = _marks()
+
     default_source = None
     default = None
-    for k, v in fallbacks.items():
-        if not_empty_string(v):
-            default_source = k
-            default = guess_boolean(v)
-            break
-    if default is None:
-        default_source = "default"
-        default = fallback
-
     environment_variable_helps = []
-    has_found_default = False
-
-    if stdout_is_utf():
-        true_mark = "✓"
-        false_mark = "✗"
-        dot_mark = "·"
-    else:
-        true_mark = "+"
-        false_mark = "✗"
-        dot_mark = "-"
-
-    for k, v in fallbacks.items():
+    for k, v in fallbacks:
         hint = env_hint(k, v, "$")
-        if not_empty_string(v) and has_found_default is False:
+        if default is None and not_empty_string(v):
+            default = guess_boolean(v)
+            default_source = env_hint(k, v, "set by $")
             if default:
                 hint = f"{true_mark} {hint}"
             else:
                 hint = f"{false_mark} {hint}"
         else:
             hint = f"{dot_mark} {hint}"
-        has_found_default = v is not None
         environment_variable_helps.append(hint)
-        if k == default_source:
-            default_source = env_hint(k, v, "set by $")
+    if default is None:
+        default_source = "default"
+        default = fallback
 
     if environment_variable_helps:
         help_texts.extend([f"  {e.strip()}" for e in environment_variable_helps])
@@ -358,6 +459,10 @@ def add_exclusive_group_with_default(
             )
 
 
+_TRAILING_WHITESPACE = re.compile(r"[^\S\n]+$", re.MULTILINE)
+_BLANK_LINE_BEFORE_OPTION = re.compile(r"\n\n(?=  --)")
+
+
 class AHelpFormatter(argparse.RawTextHelpFormatter):
     """Tweaks outputted help."""
 
@@ -366,14 +471,11 @@ class AHelpFormatter(argparse.RawTextHelpFormatter):
 
     def format_help(self) -> str:
         """Turn an argument parser into help text."""
-        lines = super().format_help().splitlines()
         # remove whitespace from the end of lines
-        lines = [line.rstrip() for line in lines]
-        # remove any extra newlines at the end
-        help_text = "\n".join(lines).rstrip("\n")
-        help_text = help_text.replace("\n\n  --", "\n  --")
-        # ensure there is exactly one newline at the end
-        return f"{help_text}\n"
+        help_text = _TRAILING_WHITESPACE.sub("", super().format_help())
+        help_text = _BLANK_LINE_BEFORE_OPTION.sub("\n", help_text)
+        # remove any extra newlines at the end and ensure there is exactly one
+        return help_text.rstrip("\n") + "\n"
 
 
 class CanAddArgument(Protocol):
@@ -386,6 +488,8 @@ class CanAddArgument(Protocol):
 class ArgumentBuilder(abc.ABC):
     """Build your arguments via these helpful classes."""
 
+    __slots__ = ()
+
     def doc(self) -> str | None:
         """Return no documentation by default."""
         return None
@@ -416,11 +520,15 @@ class ArgumentBuilder(abc.ABC):
 class FallbackToDefault(ArgumentBuilder):
     """Set up an argument with a default to use."""
 
+    __slots__ = ("_arg_name", "_dest", "_doc", "_field_name", "fallback", "value")
+
     def __init__(self, field_name: str, fallback: MaybeString, doc: MaybeString = MISSING):
         self._field_name = field_name
         self.fallback = fallback
         self._doc = doc
         self.value = MISSING  # type: MaybeString
+        self._arg_name: str | None = None
+        self._dest: str | None = None
 
     @property
     def default(self) -> MaybeString:
@@ -430,44 +538,72 @@ class FallbackToDefault(ArgumentBuilder):
     def doc(self) -> str | None:
         """Generate best-guess documentation for the argument."""
         doc = self._doc
-        match doc:
-            case _MISSING():
-                doc = ""
-            case None:
-                doc = ""
-        doc = doc.strip()
-        if len(doc) and not doc.endswith("."):
+        if not_empty_string(doc):
+            doc = doc.strip()
+        else:
+            doc = ""
+        if doc and not doc.endswith("."):
             doc = f"{doc}. "
-        match self.fallback:
-            case _MISSING():
-                return doc.strip()
-            case _:
-                return f"{doc}Defaults to {self.fallback!r}"
+        if self.fallback is MISSING:
+            return doc.strip()
+        return f"{doc}Defaults to {self.fallback!r}"
 
     def arg_name(self) -> str:
         """Turn the field name into an argument name."""
-        return "--" + self._field_name.replace("_", "-").lower()
+        if self._arg_name is None:
+            self._arg_name = "--" + self._field_name.replace("_", "-").lower()
+        return self._arg_name
 
     def field_name(self) -> str:
         """Turn the field name into an argument name and then back into a field name."""
-        return self.arg_name().removeprefix("--").replace("-", "_").lower()
+        if self._dest is None:
+            self._dest = self.arg_name().removeprefix("--").replace("-", "_").lower()
+        return self._dest
 
 
 class FallbackToEnv(ArgumentBuilder):
     """Look in the environment for a value for an argument."""
 
+    __slots__ = (
+        "_arg_name",
+        "_dest",
+        "_doc",
+        "_env_resolved",
+        "_env_value",
+        "_field_name",
+        "_owner_name",
+        "fallback",
+        "value",
+        "variable",
+    )
+
     def __init__(self, variable: str, fallback: MaybeString = MISSING, doc: MaybeString = MISSING):
         self.variable = variable
         self.fallback = fallback
         self._doc = doc
         self.value = MISSING  # type: MaybeString
-        self._owner_name = None
-        self._field_name = None
+        self._owner_name: str | None = None
+        self._field_name: str | None = None
+        self._env_value: MaybeString = MISSING
+        self._env_resolved = False
+        self._arg_name: str | None = None
+        self._dest: str | None = None
+
+    @property
+    def _resolved(self) -> MaybeString:
+        """Look up the environment variable once and share it between default and doc."""
+        if not self._env_resolved:
+            self._env_value = get_environ(self.variable)
+            self._env_resolved = True
+        return self._env_value
 
     @property
     def default(self) -> MaybeString:
         """Try to get the value for the argument."""
-        return get_environ(self.variable, self.fallback)
+        resolved = self._resolved
+        if resolved is None or resolved is MISSING:
+            return self.fallback
+        return resolved
 
     def doc(self) -> str | None:
         """Generate best-guess documentation for the argument."""
@@ -478,24 +614,24 @@ class FallbackToEnv(ArgumentBuilder):
             doc = ""
         if doc and not doc.endswith("."):
             doc = f"{doc}. "
-        env = get_environ(self.variable)
-        match env:
-            case _MISSING():
-                variable = f"${self.variable} (unset)"
-            case _:
-                variable = f"${self.variable}={env!r}"
-        match self.fallback:
-            case _MISSING():
-                pass
-            case _:
-                variable = f"{variable} or {self.fallback}"
+        env = self._resolved
+        if env is None or env is MISSING:
+            variable = f"${self.variable} (unset)"
+        else:
+            variable = f"${self.variable}={env!r}"
+        if self.fallback is not MISSING:
+            variable = f"{variable} or {self.fallback}"
         return f"{doc}Defaults to {variable!r}"
 
     def arg_name(self) -> str:
         """Get the argument name."""
-        arg_name = self._field_name or self.variable
-        return "--" + arg_name.replace("_", "-").lower()
+        if self._arg_name is None:
+            arg_name = self._field_name or self.variable
+            self._arg_name = "--" + arg_name.replace("_", "-").lower()
+        return self._arg_name
 
     def field_name(self) -> str:
         """Get the field name."""
-        return self.arg_name().removeprefix("--").replace("-", "_").lower()
+        if self._dest is None:
+            self._dest = self.arg_name().removeprefix("--").replace("-", "_").lower()
+        return self._dest
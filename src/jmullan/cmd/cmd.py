@@ -2,25 +2,69 @@
 
 import abc
 import argparse
+import functools
+import hashlib
 import logging
+import os
 import pathlib
+import re
 import signal
 import sys
-from collections.abc import Callable
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from importlib import metadata
 from types import FrameType, TracebackType
-from typing import TextIO
+from typing import AnyStr, BinaryIO, TextIO
 
 import jmullan.cmd.auto_config
 
 logger = logging.getLogger(__name__)
 
+URL_PREFIXES = ("https://", "http://")
 
-class Jmullan:
-    """Hold some globals as class members."""
+# Read files in large blocks so that whole-file reads and line iteration make fewer read() calls.
+READ_BUFFER_SIZE = 1 << 20
+# Collect roughly this many characters of output before writing them out.
+OUTPUT_BATCH_SIZE = 1 << 16
+
+
+_GO = threading.Event()
+_GO.set()
+_PIPE_OK = threading.Event()
+_PIPE_OK.set()
+
+
+class _JmullanGlobals(type):
+    """Back Jmullan's flags with events, while they still read and assign as booleans."""
+
+    @property
+    def GO(cls) -> bool:  # noqa: N802
+        """Whether processing should carry on."""
+        return _GO.is_set()
+
+    @GO.setter
+    def GO(cls, go: bool) -> None:  # noqa: N802
+        if go:
+            _GO.set()
+        else:
+            _GO.clear()
+
+    @property
+    def PIPE_OK(cls) -> bool:  # noqa: N802
+        """Whether stdout is still open."""
+        return _PIPE_OK.is_set()
+
+    @PIPE_OK.setter
+    def PIPE_OK(cls, pipe_ok: bool) -> None:  # noqa: N802
+        if pipe_ok:
+            _PIPE_OK.set()
+        else:
+            _PIPE_OK.clear()
 
-    GO = True
-    PIPE_OK = True
+
+class Jmullan(metaclass=_JmullanGlobals):
+    """Hold some globals as class members."""
 
 
 def handle_signal(signum: int, _: FrameType | None) -> None:
@@ -36,9 +80,21 @@ def handle_signal(signum: int, _: FrameType | None) -> None:
     Jmullan.GO = False
 
 
+def install_signal_handler(signum: int, handler: Callable | int) -> None:
+    """Install a signal handler, unless it is already installed."""
+    if signal.getsignal(signum) is not handler:
+        signal.signal(signum, handler)
+
+
+def install_except_hook() -> None:
+    """Use broken_pipe_except_hook for uncaught exceptions."""
+    if sys.excepthook is not broken_pipe_except_hook:
+        sys.excepthook = broken_pipe_except_hook
+
+
 def handle_keyboard_interrupt() -> None:
     """Turn a keyboard interrupt into a signal."""
-    signal.signal(signal.SIGINT, handle_signal)
+    install_signal_handler(signal.SIGINT, handle_signal)
 
 
 def broken_pipe_except_hook(
@@ -59,10 +115,10 @@ def ignore_broken_pipe_error() -> bool:
     Does not work in Windows because there is no SIGPIPE.
     """
     if hasattr(signal, "SIGPIPE"):
-        sys.excepthook = broken_pipe_except_hook
+        install_except_hook()
         # https://docs.python.org/3/library/signal.html#signal.signal
         # SIG_DFL: take default action (raise a broken pipe error)
-        signal.signal(signal.SIGPIPE, signal.SIG_DFL)
+        install_signal_handler(signal.SIGPIPE, signal.SIG_DFL)
         return True
     return False
 
@@ -73,8 +129,8 @@ def stop_on_broken_pipe_error() -> bool:
     Does not work in Windows because there is no SIGPIPE.
     """
     if hasattr(signal, "SIGPIPE"):
-        sys.excepthook = broken_pipe_except_hook
-        signal.signal(signal.SIGPIPE, handle_signal)
+        install_except_hook()
+        install_signal_handler(signal.SIGPIPE, handle_signal)
         return True
     return False
 
@@ -90,25 +146,93 @@ def open_file_or_stdin(filename: str) -> TextIO:
     """Open a file, use stdin, or make an http request."""
     if filename == "-":
         return sys.stdin
-    if filename.startswith(("https://", "http://")):
+    if filename.startswith(URL_PREFIXES):
         return open_via_requests(filename)
-    return pathlib.Path(filename).open("r", encoding="utf-8", newline="\n")
+    # plain open() skips building a Path for every file
+    return open(filename, buffering=READ_BUFFER_SIZE, encoding="utf-8", newline="\n")  # noqa: PTH123
+
+
+def open_file_or_stdin_bytes(filename: str) -> BinaryIO:
+    """Open a file, use stdin, or make an http request, without decoding anything."""
+    if filename == "-":
+        return sys.stdin.buffer
+    if filename.startswith(URL_PREFIXES):
+        from jmullan.cmd import requests_handle  # noqa: PLC0415
+
+        return requests_handle.open_raw(filename)
+    return open(filename, "rb", buffering=READ_BUFFER_SIZE)  # noqa: PTH123
+
+
+def is_local_file(filename: str) -> bool:
+    """Check if a filename names a file on disk rather than stdin or a url."""
+    return filename != "-" and not filename.startswith(URL_PREFIXES)
+
+
+def can_read_ahead(filename: str) -> bool:
+    """Check if a file can safely be read before it is needed.
+
+    Urls can be: reading one ahead fetches the whole body and closes the
+    response, so several slow requests can be waited on at once.
+    """
+    return filename != "-"
+
+
+def read_local_file(filename: str) -> str:
+    """Read a whole file straight from its file descriptor and decode it in one go."""
+    fd = os.open(filename, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        if hasattr(os, "posix_fadvise") and size:
+            os.posix_fadvise(fd, 0, size, os.POSIX_FADV_SEQUENTIAL)
+        # pipes and special files report a size of 0, and files can grow, so read until eof
+        chunks = []
+        while chunk := os.read(fd, max(size + 1, READ_BUFFER_SIZE)):
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    return b"".join(chunks).decode("utf-8")
 
 
 def read_file_or_stdin(filename: str) -> str:
     """Open and read a file, stdin, or a url."""
+    if is_local_file(filename):
+        return read_local_file(filename)
     with open_file_or_stdin(filename) as handle:
         return handle.read()
 
 
+def write_to_stdout(contents: str) -> None:
+    """Write and flush text to stdout, skipping the text layer when there is a binary buffer under it."""
+    stdout = sys.stdout
+    buffer = getattr(stdout, "buffer", None)
+    if buffer is None:
+        stdout.write(contents)
+        stdout.flush()
+        return
+    stdout.flush()
+    buffer.write(contents.encode(stdout.encoding or "utf-8", errors=stdout.errors or "strict"))
+    buffer.flush()
+
+
 def write_to_file_or_stdout(filename: str, contents: str) -> None:
     """Open and write to a file or stdout."""
     if filename == "-":
-        sys.stdout.write(contents)
-        sys.stdout.flush()
+        write_to_stdout(contents)
     else:
-        with pathlib.Path(filename).open("w", encoding="utf-8", newline="\n") as f:
-            f.write(contents)
+        write_local_file(filename, contents)
+
+
+def write_local_file(filename: str, contents: str) -> None:
+    """Encode contents once and write them straight to a file's descriptor."""
+    data = memoryview(contents.encode("utf-8"))
+    # 0o666 leaves the permissions of new files up to the umask, as open() does
+    fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        written = 0
+        while written < len(data):
+            written += os.write(fd, data[written:])
+    finally:
+        os.close(fd)
 
 
 def add_filenames_arguments(parser: argparse.ArgumentParser) -> None:
@@ -123,36 +247,152 @@ def add_filenames_arguments(parser: argparse.ArgumentParser) -> None:
     )
 
 
+def add_jobs_argument(parser: argparse.ArgumentParser) -> None:
+    """Add an argument for processing files in several processes at once."""
+    parser.add_argument(
+        "--jobs",
+        dest="jobs",
+        type=int,
+        default=1,
+        help="process this many files at once in separate processes",
+    )
+
+
 def get_filenames(args: argparse.Namespace) -> list[str]:
     """Extract filenames from args.
 
     If no filenames are provided, returns "-", which is used as a placeholder
-    for stdin.
+    for stdin. Filenames given more than once are only returned once, since
+    stdin can only be read once and a file should only be changed once.
     """
-    filenames = args.filenames or []
+    filenames = list(dict.fromkeys(args.filenames or []))
     if not filenames:
         filenames.append("-")
     return filenames
 
 
-def update_in_place(filename: str, changer: Callable[[str], str]) -> None:
-    """Load a file, transform its contents, and write them back into the file."""
-    contents = read_file_or_stdin(filename)
+def get_cache_dir() -> pathlib.Path:
+    """Find where jmullan.cmd keeps its cache files."""
+    cache_home = os.environ.get("XDG_CACHE_HOME")
+    cache_path = pathlib.Path(cache_home) if cache_home else pathlib.Path("~/.cache").expanduser()
+    return cache_path / "jmullan.cmd"
+
+
+def get_unchanged_marker(cache_key: str, contents: str) -> pathlib.Path:
+    """Get the file whose existence records that a changer with this cache key left these contents alone."""
+    digest = hashlib.blake2b(cache_key.encode("utf-8"), digest_size=16)
+    digest.update(b"\0")
+    digest.update(contents.encode("utf-8"))
+    return get_cache_dir() / "unchanged" / digest.hexdigest()
+
+
+def get_unchanged_file_marker(cache_key: str, file_digest: bytes) -> pathlib.Path:
+    """Get the file whose existence records that a streamer with this cache key left a file with this hash alone."""
+    digest = hashlib.blake2b(cache_key.encode("utf-8"), digest_size=16)
+    digest.update(b"\1")
+    digest.update(file_digest)
+    return get_cache_dir() / "unchanged" / digest.hexdigest()
+
+
+def mark_unchanged(marker: pathlib.Path, filename: str) -> None:
+    """Record that a file was left unchanged, which is only ever an optimization."""
+    try:
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        marker.touch()
+    except OSError:
+        logger.debug("could not cache unchanged file %s", filename, exc_info=True)
+
+
+def update_in_place(
+    filename: str,
+    changer: Callable[[str], str],
+    contents: str | None = None,
+    cache_key: str | None = None,
+) -> None:
+    """Load a file, transform its contents, and write them back into the file.
+
+    With a cache_key, contents that the changer has left alone before are
+    not given to it again. The key must change whenever the changer's
+    behavior does.
+
+    Stdin cannot be changed in place, so its changed contents are printed.
+    """
+    if filename == "-":
+        update_and_print(filename, changer, contents)
+        return
+    if contents is None:
+        contents = read_file_or_stdin(filename)
+    marker = None
+    if cache_key is not None:
+        marker = get_unchanged_marker(cache_key, contents)
+        if marker.exists():
+            logger.debug("skipped unchanged file %s", filename)
+            return
     new_contents = changer(contents)
     changed = new_contents != contents
     if changed:
         logger.debug("updated file %s", filename)
         write_to_file_or_stdout(filename, new_contents)
+    elif marker is not None:
+        mark_unchanged(marker, filename)
+
+
+def hash_file(filename: str) -> bytes:
+    """Hash a file's bytes without holding the whole file in memory."""
+    with open(filename, "rb") as handle:  # noqa: PTH123
+        return hashlib.file_digest(handle, "blake2b").digest()
+
 
+def update_in_place_streaming(
+    filename: str,
+    streamer: Callable[[TextIO], Iterator[str] | None],
+    cache_key: str | None = None,
+) -> bool:
+    """Stream a file through a transform, and rewrite the file only if that changed anything.
 
-def update_and_print(filename: str, changer: Callable[[str], str]) -> None:
+    The streamed output is hashed and compared against a hash of the file, so
+    an unchanged file is never held in memory, though it is read twice: once
+    to hash it and once to stream it. A changed file is streamed a second
+    time to build the new contents.
+
+    With a cache_key, files that the streamer has left alone before are only
+    hashed, not streamed again. The key must change whenever the streamer's
+    behavior does.
+
+    Returns False without doing anything if the streamer returns None.
+    """
+    file_digest = hash_file(filename)
+    marker = None
+    if cache_key is not None:
+        marker = get_unchanged_file_marker(cache_key, file_digest)
+        if marker.exists():
+            logger.debug("skipped unchanged file %s", filename)
+            return True
+    digest = hashlib.blake2b()
+    with open_file_or_stdin(filename) as handle:
+        chunks = streamer(handle)
+        if chunks is None:
+            return False
+        for chunk in chunks:
+            digest.update(chunk.encode("utf-8"))
+    if digest.digest() != file_digest:
+        with open_file_or_stdin(filename) as handle:
+            new_contents = "".join(streamer(handle) or ())
+        logger.debug("updated file %s", filename)
+        write_to_file_or_stdout(filename, new_contents)
+    elif marker is not None:
+        mark_unchanged(marker, filename)
+    return True
+
+
+def update_and_print(filename: str, changer: Callable[[str], str], contents: str | None = None) -> None:
     """Load a file, transform its contents, and print them out."""
-    contents = read_file_or_stdin(filename)
+    if contents is None:
+        contents = read_file_or_stdin(filename)
     new_contents = changer(contents)
     changed = new_contents != contents
     if changed:
-        sys.stdout.write(new_contents)
-        sys.stdout.flush()
+        write_to_stdout(new_contents)
 
 
 def get_module_docstring(module_name: str) -> str | None:
@@ -176,29 +416,40 @@ def find_command_help(command: object) -> str | None:
     """Examine strings to find the first candidate to use as help."""
     if command is None:
         return None
-    clazz = getattr(command, "__class__", object)
+    return find_class_help(getattr(command, "__class__", object))
+
+
+def _candidate_docs(clazz: type) -> Iterator[str | None]:
+    """Yield the strings that could be used as a class's help, in order of preference."""
+    yield find_method_help(getattr(clazz, "main", object))
+    yield find_method_help(getattr(clazz, "__init__", object))
+    yield clazz.__doc__
+    yield get_module_docstring(clazz.__module__)
+
+
+@functools.lru_cache(maxsize=256)
+def find_class_help(clazz: type) -> str | None:
+    """Find the help for a command class, which is the same for all of its instances."""
     if bool(getattr(clazz, "__abstractmethods__", None)):
         return None
-    docs = [
-        find_method_help(getattr(command, "main", object)),
-        find_method_help(getattr(command, "__init__", object)),
-        command.__doc__,
-        get_module_docstring(command.__module__),
-    ]
-    command_name = get_package_name(command)
-    version = get_version(command)
+    doc = next(
+        (doc for doc in _candidate_docs(clazz) if doc is not None and doc.strip() and not doc.startswith("#")),
+        None,
+    )
+    if doc is None:
+        return None
+    # package metadata is only looked up once there is a doc to prefix
+    command_name = get_package_name(clazz)
+    version = get_version(clazz)
     if command_name is not None and version is not None:
         command_name_and_version = f"{command_name} {version}"
     elif command_name is not None:
         command_name_and_version = command_name
     else:
         command_name_and_version = f"Version {version}"
-    for doc in docs:
-        if doc is not None and len(doc.strip()) and not doc.startswith("#"):
-            if command_name_and_version is not None and command_name_and_version not in doc:
-                return f"{command_name_and_version}:\n{doc}"
-            return doc
-    return None
+    if command_name_and_version not in doc:
+        return f"{command_name_and_version}:\n{doc}"
+    return doc
 
 
 def get_package_name(command: object) -> str | None:
@@ -275,6 +526,12 @@ class Main(abc.ABC):
         )
         self.args = None
 
+    def __getstate__(self) -> dict:
+        """Leave the parser behind when copying this command into a worker process."""
+        state = self.__dict__.copy()
+        state.pop("parser", None)
+        return state
+
     def get_argparse_formatter_class(self) -> type[argparse.HelpFormatter]:
         """Override me if you need a different formatter."""
         return jmullan.cmd.auto_config.AHelpFormatter
@@ -327,15 +584,24 @@ class FileNameProcessor(Main, abc.ABC):
     def main(self) -> None:
         """Process all the requested filenames."""
         super().main()
-        for filename in self.get_filenames():
-            if not Jmullan.GO:
+        self.process_filenames(self.get_filenames())
+
+    def process_filenames(self, filenames: list[str]) -> None:
+        """Process the filenames one after another."""
+        go = _GO.is_set
+        process_filename = self.process_filename
+        for filename in filenames:
+            if not go():
                 break
-            self.process_filename(filename)
+            process_filename(filename)
 
 
 class ContentsProcessor(FileNameProcessor, abc.ABC):
     """Processes the full text contents of a file."""
 
+    # How many upcoming files to read in the background; 0 turns reading ahead off.
+    read_ahead = 4
+
     @abc.abstractmethod
     def process_contents(self, contents: str) -> str:
         """Process the full text contents of a file.
@@ -343,13 +609,116 @@ class ContentsProcessor(FileNameProcessor, abc.ABC):
         This is for you to implement.
         """
 
+    def process_contents_streaming(self, handle: TextIO) -> Iterator[str] | None:  # noqa: ARG002
+        """Optionally process a file a piece at a time.
+
+        Return an iterator of output chunks to let in-place processing skip
+        loading unchanged files into memory. It may be called twice per file,
+        so it must give the same output each time. Returning None uses
+        process_contents instead.
+        """
+        return None
+
+    def streams_contents(self) -> bool:
+        """Check whether process_contents_streaming has been overridden."""
+        return type(self).process_contents_streaming is not ContentsProcessor.process_contents_streaming
+
+    def read_contents(self, filename: str) -> str:
+        """Read a file's contents, collecting them if they were read ahead of time."""
+        # _read_ahead only exists once process_filenames has run, since subclasses may skip __init__
+        read_ahead: dict[str, Future[str]] = getattr(self, "_read_ahead", {})
+        future = read_ahead.pop(filename, None)
+        if future is not None:
+            return future.result()
+        return read_file_or_stdin(filename)
+
+    def process_filenames(self, filenames: list[str]) -> None:
+        """Process the filenames, reading upcoming files while the current one is processed.
+
+        Stdin is never read ahead, and nothing is read ahead for processors
+        that stream their contents. Filenames are expected to be unique, as
+        get_filenames makes them.
+        """
+        depth = self.read_ahead
+        if depth <= 0 or self.streams_contents():
+            super().process_filenames(filenames)
+            return
+        read_ahead: dict[str, Future[str]] = {}
+        self._read_ahead = read_ahead
+        try:
+            with ThreadPoolExecutor(max_workers=depth) as executor:
+                try:
+                    for index, filename in enumerate(filenames):
+                        if not Jmullan.GO:
+                            break
+                        for upcoming in filenames[index + 1 : index + 1 + depth]:
+                            if upcoming not in read_ahead and can_read_ahead(upcoming):
+                                read_ahead[upcoming] = executor.submit(read_file_or_stdin, upcoming)
+                        self.process_filename(filename)
+                        read_ahead.pop(filename, None)
+                finally:
+                    # drop queued work now, rather than waiting for it when the executor shuts down
+                    executor.shutdown(cancel_futures=True)
+        finally:
+            for future in read_ahead.values():
+                future.cancel()
+            read_ahead.clear()
+
 
 class InPlaceFileProcessor(ContentsProcessor, abc.ABC):
     """Process a file and write it back out in place."""
 
+    def unchanged_cache_key(self) -> str | None:
+        """Optionally remember which file contents process_contents leaves alone.
+
+        Return a string that changes whenever process_contents or
+        process_contents_streaming would behave differently, such as your
+        version and options, to skip files that were already left unchanged
+        on an earlier run. Returning None turns this off.
+        """
+        return None
+
     def process_filename(self, filename: str) -> None:
         """Process a filename and write it back out in place."""
-        update_in_place(filename, self.process_contents)
+        if (
+            self.streams_contents()
+            and filename not in getattr(self, "_read_ahead", ())
+            and is_local_file(filename)
+            and update_in_place_streaming(filename, self.process_contents_streaming, self.unchanged_cache_key())
+        ):
+            return
+        update_in_place(
+            filename,
+            self.process_contents,
+            self.read_contents(filename),
+            cache_key=self.unchanged_cache_key(),
+        )
+
+    def setup(self) -> None:
+        """Add a jobs argument to the parser."""
+        add_jobs_argument(self.parser)
+        super().setup()
+
+    def process_filenames(self, filenames: list[str]) -> None:
+        """Process the filenames, in several processes at once if --jobs asks for it."""
+        jobs = getattr(self.args, "jobs", 1) or 1
+        if jobs > 1 and len(filenames) > 1 and "-" not in filenames:
+            self.process_filenames_in_parallel(filenames, jobs)
+        else:
+            super().process_filenames(filenames)
+
+    def process_filenames_in_parallel(self, filenames: list[str], jobs: int) -> None:
+        """Process the filenames in a pool of worker processes.
+
+        Each worker gets a copy of this command, minus its parser, so
+        process_filename must not rely on state shared between files.
+        """
+        chunksize = max(1, len(filenames) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=handle_keyboard_interrupt) as executor:
+            for _ in executor.map(self.process_filename, filenames, chunksize=chunksize):
+                if not Jmullan.GO:
+                    executor.shutdown(cancel_futures=True)
+                    break
 
 
 class PrintingFileProcessor(ContentsProcessor, abc.ABC):
@@ -357,12 +726,15 @@ class PrintingFileProcessor(ContentsProcessor, abc.ABC):
 
     def process_filename(self, filename: str) -> None:
         """Process a filename and print the result."""
-        update_and_print(filename, self.process_contents)
+        update_and_print(filename, self.process_contents, self.read_contents(filename))
 
 
 class TextIoProcessor(FileNameProcessor, abc.ABC):
     """A file processor for reading and processing the entire contents at once.."""
 
+    # Whether to request the next url in the background while the current file is processed.
+    open_ahead = True
+
     @abc.abstractmethod
     def process_file_handle(self, filename: str, file_handle: TextIO) -> None:
         """Process a file handle.
@@ -370,14 +742,107 @@ class TextIoProcessor(FileNameProcessor, abc.ABC):
         This is for you to implement.
         """
 
+    def open_handle(self, filename: str) -> TextIO:
+        """Open a filename, collecting its handle if it was opened ahead of time."""
+        # _opened_ahead only exists once process_filenames has run, since subclasses may skip __init__
+        opened_ahead: dict[str, Future[TextIO]] = getattr(self, "_opened_ahead", {})
+        future = opened_ahead.pop(filename, None)
+        if future is not None:
+            return future.result()
+        return open_file_or_stdin(filename)
+
     def process_filename(self, filename: str) -> None:
         """Open and process a filename."""
-        with open_file_or_stdin(filename) as handle:
+        with self.open_handle(filename) as handle:
             self.process_file_handle(filename, handle)
 
+    def process_filenames(self, filenames: list[str]) -> None:
+        """Process the filenames, requesting the next url while the current file is processed.
+
+        Filenames are expected to be unique, as get_filenames makes them,
+        and handles that end up unused are closed.
+        """
+        if not self.open_ahead:
+            super().process_filenames(filenames)
+            return
+        go = _GO.is_set
+        opened_ahead: dict[str, Future[TextIO]] = {}
+        self._opened_ahead = opened_ahead
+        try:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                try:
+                    for index, filename in enumerate(filenames):
+                        if not go():
+                            break
+                        upcoming = filenames[index + 1] if index + 1 < len(filenames) else None
+                        if upcoming is not None and upcoming.startswith(URL_PREFIXES) and upcoming not in opened_ahead:
+                            opened_ahead[upcoming] = executor.submit(open_file_or_stdin, upcoming)
+                        self.process_filename(filename)
+                finally:
+                    # drop queued work now, rather than waiting for it when the executor shuts down
+                    executor.shutdown(cancel_futures=True)
+        finally:
+            # the executor has shut down by now, so every future is either cancelled or done
+            for future in opened_ahead.values():
+                if not future.cancel() and future.exception() is None:
+                    future.result().close()
+            opened_ahead.clear()
+
+
+def process_lines(  # noqa: PLR0913
+    filename: str,
+    lines: Iterable[AnyStr],
+    process_line: Callable[[str, AnyStr], tuple[bool, AnyStr]],
+    write: Callable[[AnyStr], object],
+    writelines: Callable[[list[AnyStr]], object],
+    *,
+    batch_size: int,
+) -> None:
+    """Process lines one at a time and write out the ones that should be printed.
+
+    Printed lines are collected and written in batches of about batch_size
+    characters or bytes, or written one at a time if batch_size is 0.
+    """
+    go = _GO.is_set
+    if batch_size <= 0:
+        for line in lines:
+            if not go():
+                break
+            should_print, processed = process_line(filename, line)
+            if should_print:
+                write(processed)
+        return
+
+    batch: list[AnyStr] = []
+    batched = 0
+    try:
+        for line in lines:
+            if not go():
+                break
+            should_print, processed = process_line(filename, line)
+            if should_print:
+                batch.append(processed)
+                batched += len(processed)
+                if batched >= batch_size:
+                    # swap in a new batch first, so a failed write is not repeated below
+                    full, batch = batch, []
+                    batched = 0
+                    writelines(full)
+    finally:
+        # whatever was processed before an error or interrupt still gets written
+        if batch:
+            writelines(batch)
+
 
 class TextIoLineProcessor(TextIoProcessor, abc.ABC):
-    """A file processor for processing one line at a time."""
+    """A file processor for processing one line at a time.
+
+    When stdout is not a terminal, printed lines are collected and written
+    out in batches of about output_batch_size characters. Set it to 0 to
+    write every line as soon as it is processed.
+    """
+
+    output_batch_size = OUTPUT_BATCH_SIZE
 
     @abc.abstractmethod
     def process_line(self, filename: str, line: str) -> tuple[bool, str]:
@@ -388,9 +853,116 @@ class TextIoLineProcessor(TextIoProcessor, abc.ABC):
 
     def process_file_handle(self, filename: str, file_handle: TextIO) -> None:
         """Process a file handle line by line."""
-        for line in file_handle:
-            if not Jmullan.GO:
-                break
-            should_print, processed = self.process_line(filename, line)
-            if should_print:
-                sys.stdout.write(processed)
+        stdout = sys.stdout
+        batch_size = 0 if self.is_tty else self.output_batch_size
+        process_lines(filename, file_handle, self.process_line, stdout.write, stdout.writelines, batch_size=batch_size)
+
+
+def compile_any(patterns: Iterable[str], flags: re.RegexFlag = re.NOFLAG) -> Callable[[str], bool]:
+    """Compile patterns into a check for whether any of them is found in a string.
+
+    Patterns without groups or inline flags are combined into one
+    expression, so the string is searched once. Otherwise each pattern is
+    searched on its own, so backreferences, group names, and flags keep
+    their meaning.
+    """
+    patterns = tuple(patterns)
+    compiled = [re.compile(pattern, flags) for pattern in patterns]
+    plain_flags = re.compile("", flags).flags
+    # verbose patterns could comment out the parenthesis that closes their group
+    if not flags & re.VERBOSE and all(each.groups == 0 and each.flags == plain_flags for each in compiled):
+        search = re.compile("|".join(f"(?:{pattern})" for pattern in patterns), flags).search
+        return lambda string: search(string) is not None
+    searches = [each.search for each in compiled]
+    return lambda string: any(search(string) for search in searches)
+
+
+class RegexLineProcessor(TextIoLineProcessor, abc.ABC):
+    """A line processor that prints the lines matching any of its patterns.
+
+    Set patterns to the regular expressions to look for. Where it is safe,
+    they are combined into one expression, so each line is searched once
+    however many patterns there are.
+    """
+
+    patterns: tuple[str, ...] = ()
+    pattern_flags: re.RegexFlag = re.NOFLAG
+
+    def __init__(self) -> None:
+        super().__init__()
+        if not self.patterns:
+            msg = f"{type(self).__name__} needs at least one pattern"
+            raise ValueError(msg)
+        self._matches = compile_any(self.patterns, self.pattern_flags)
+
+    def process_line(self, filename: str, line: str) -> tuple[bool, str]:  # noqa: ARG002
+        """Print the line if any pattern matches it."""
+        return self._matches(line), line
+
+
+class BytesIoProcessor(FileNameProcessor, abc.ABC):
+    """A file processor for reading files as bytes, without decoding them."""
+
+    @abc.abstractmethod
+    def process_file_handle(self, filename: str, file_handle: BinaryIO) -> None:
+        """Process a binary file handle.
+
+        This is for you to implement.
+        """
+
+    def process_filename(self, filename: str) -> None:
+        """Open and process a filename."""
+        with open_file_or_stdin_bytes(filename) as handle:
+            self.process_file_handle(filename, handle)
+
+
+class BytesIoLineProcessor(BytesIoProcessor, abc.ABC):
+    """A file processor for processing one line of bytes at a time.
+
+    Use this instead of TextIoLineProcessor when lines can be handled
+    without decoding them, and decode only the lines you need to.
+    Output is written to stdout's binary buffer, batched like
+    TextIoLineProcessor's.
+    """
+
+    output_batch_size = OUTPUT_BATCH_SIZE
+
+    @abc.abstractmethod
+    def process_line(self, filename: str, line: bytes) -> tuple[bool, bytes]:
+        """Process one line of a binary file handle.
+
+        This is for you to implement.
+        """
+
+    def process_file_handle(self, filename: str, file_handle: BinaryIO) -> None:
+        """Process a binary file handle line by line."""
+        batch_size = 0 if self.is_tty else self.output_batch_size
+        stdout = sys.stdout
+        buffer = getattr(stdout, "buffer", None)
+        if buffer is None:
+            # a replaced stdout, such as a StringIO, only takes text
+            encoding = getattr(stdout, "encoding", None) or "utf-8"
+
+            def write(data: bytes) -> None:
+                stdout.write(data.decode(encoding, errors="replace"))
+
+            def writelines(batch: list[bytes]) -> None:
+                write(b"".join(batch))
+
+            flush = stdout.flush
+        else:
+            stdout.flush()
+            writelines = buffer.writelines
+            flush = buffer.flush
+            if batch_size > 0:
+                write = buffer.write
+            else:
+
+                def write(data: bytes) -> None:
+                    buffer.write(data)
+                    flush()
+
+        try:
+            process_lines(filename, file_handle, self.process_line, write, writelines, batch_size=batch_size)
+        finally:
+            flush()
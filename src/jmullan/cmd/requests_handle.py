@@ -1,30 +1,107 @@
 """Helpers that rely on requests live here."""
 
+import atexit
+import codecs
+import io
 import logging
-from collections.abc import Generator
+import os
+import threading
+from collections.abc import Iterator
 from types import TracebackType
-from typing import Literal, Self
+from typing import TYPE_CHECKING, BinaryIO, Literal, Self
 
-import requests
-
-from jmullan.logging.helpers import logging_context  # type: ignore[import-not-found]
+if TYPE_CHECKING:
+    import requests
 
 logger = logging.getLogger(__name__)
 
 
+def _chunk_size_from_env(default: int) -> int:
+    """Let JMULLAN_HTTP_CHUNK override how many bytes are requested per chunk."""
+    try:
+        return max(1, int(os.environ.get("JMULLAN_HTTP_CHUNK", default)))
+    except ValueError:
+        return default
+
+
+MIN_CHUNK_SIZE = _chunk_size_from_env(64 * 1024)
+
+# Seconds to wait to connect, and then between bytes of the response, when the caller gives no timeout.
+DEFAULT_TIMEOUT = (5, 30)
+
+Timeout = float | tuple[float, float] | None
+
+_SESSION: "requests.Session | None" = None
+_SESSION_LOCK = threading.Lock()
+
+
+def get_session() -> "requests.Session":
+    """Get the session shared by every request, so connections to a host are reused.
+
+    The one session is shared by every thread, including the ones that read
+    and open files ahead of time. Connections that fail are retried twice;
+    requests whose response was cut off are not sent again.
+    """
+    global _SESSION  # noqa: PLW0603
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            import requests  # noqa: PLC0415
+            from requests.adapters import HTTPAdapter  # noqa: PLC0415
+            from urllib3.util.retry import Retry  # noqa: PLC0415
+
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=16,
+                pool_maxsize=32,
+                max_retries=Retry(total=2, read=0, backoff_factor=0.1),
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            atexit.register(session.close)
+            _SESSION = session
+        return _SESSION
+
+
+def open_raw(url: str, timeout: Timeout = None) -> BinaryIO:
+    """Get a url as a binary stream of its decompressed body.
+
+    A timeout of None uses DEFAULT_TIMEOUT, so a stalled server cannot block forever.
+    """
+    logger.debug("Opening url")
+    response = get_session().get(url, stream=True, timeout=DEFAULT_TIMEOUT if timeout is None else timeout)
+    response.raw.decode_content = True
+    return response.raw  # type: ignore[return-value]
+
+
+def fix_encoding(response: "requests.Response") -> str:
+    """Decode as utf-8 when the server names no charset, or one Python doesn't know."""
+    encoding = response.encoding
+    if encoding is not None:
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            encoding = None
+    if encoding is None:
+        # also skips requests' slow character set detection
+        encoding = response.encoding = "utf-8"
+    return encoding
+
+
 class RequestsHandle:
     """Provides a file-handle-like object for reading."""
 
     url: str
-    response: requests.Response | None
+    response: "requests.Response | None"
     _closed: bool
+    _body: str | None
 
-    def __init__(self, url: str, timeout: int | None = None):
-        """Get a url."""
+    def __init__(self, url: str, timeout: Timeout = None):
+        """Get a url, waiting at most DEFAULT_TIMEOUT if no timeout is given."""
         logger.debug("Opening url")
         self.url = url
-        self.response = requests.get(url, stream=True, timeout=timeout)
+        self.response = get_session().get(url, stream=True, timeout=DEFAULT_TIMEOUT if timeout is None else timeout)
         self._closed = False
+        self._body = None
 
     def __enter__(self) -> Self:
         """Provide this object as a context manager."""
@@ -40,6 +117,28 @@ class RequestsHandle:
         self.close()
         return False
 
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over lines, keeping their newlines, without loading the whole body."""
+        if self.response is None:
+            return
+        try:
+            fix_encoding(self.response)
+            # the unfinished line is kept in parts, so a long line is not copied once per chunk
+            pending: list[str] = []
+            for chunk in self.response.iter_content(chunk_size=MIN_CHUNK_SIZE, decode_unicode=True):
+                first, *lines = chunk.split("\n")
+                pending.append(first)
+                if lines:
+                    yield "".join(pending) + "\n"
+                    *lines, last = lines
+                    for line in lines:
+                        yield line + "\n"
+                    pending = [last]
+            if tail := "".join(pending):
+                yield tail
+        finally:
+            self.close()
+
     def close(self, *args, **kwargs) -> None:  # real signature unknown
         """Close the IO object.
 
@@ -48,17 +147,23 @@ class RequestsHandle:
 
         This method has no effect if the file is already closed.
         """
+        if self._closed:
+            return
         self._closed = True
         try:
             if self.response is not None:
                 self.response.close()
                 self.response = None
         except Exception:
+            from jmullan.logging.helpers import logging_context  # type: ignore[import-not-found]  # noqa: PLC0415
+
             with logging_context(external_http_url=self.url):
                 logger.exception("Error closing request")
 
     def getvalue(self, *args, **kwargs) -> str | None:  # real signature unknown
         """Retrieve the entire contents of the object."""
+        if self._body is not None:
+            return self._body
         if self.response is None:
             return None
         return self.response.text
@@ -72,9 +177,15 @@ class RequestsHandle:
         if self.response is None:
             return None
         try:
+            encoding = fix_encoding(self.response)
             if size is None:
-                return self.response.text
-            return "".join(self.response.iter_content(chunk_size=size, decode_unicode=True))
+                self._body = self.response.content.decode(encoding, errors="replace")
+                return self._body
+            buffer = io.StringIO()
+            for chunk in self.response.iter_content(chunk_size=max(size, MIN_CHUNK_SIZE), decode_unicode=True):
+                buffer.write(chunk)
+            self._body = buffer.getvalue()
+            return self._body
         finally:
             self.close()
 
@@ -82,16 +193,6 @@ class RequestsHandle:
         """Return True if the IO object can be read."""
         return self.response is not None and not self._closed
 
-    def readline(self, size: int | None = -1, /) -> Generator[str, None, None]:  # real signature unknown
-        """Read until newline or EOF.
-
-        Returns an empty string if EOF is hit immediately.
-        """
-        if self.response is None:
-            return
-        yield from self.response.iter_lines(chunk_size=size, decode_unicode=True)
-        self.close()
-
     def seek(self, *args, **kwargs) -> None:  # real signature unknown
         """Change stream position.
 
@@ -1,8 +1,6 @@
 import logging
 from sys import stdout
 
-from jmullan.logging.easy_logging import easy_initialize_logging
-
 from jmullan.cmd import auto_config, cmd
 
 logger = logging.getLogger(__name__)
@@ -44,6 +42,9 @@ class DemoMain(cmd.Main):
 
     def setup(self) -> None:
         super().setup()
+        # imported here so that --help never pays for loading the logging package
+        from jmullan.logging.easy_logging import easy_initialize_logging  # noqa: PLC0415
+
         if self.args.verbose:
             easy_initialize_logging("DEBUG")
         elif self.args.quiet:
@@ -6,12 +6,24 @@ import pytest
 from jmullan.cmd import auto_config
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    auto_config._clear_caches()
+    yield
+    auto_config._clear_caches()
+
+
 @pytest.fixture
-def environment():
-    fake_environ = {}
+def mock_get_environ():
     with patch("jmullan.cmd.auto_config.get_environ") as mock_get_environ:
-        mock_get_environ.side_effect = lambda k, d=None: fake_environ.get(k, d)
-        yield fake_environ
+        yield mock_get_environ
+
+
+@pytest.fixture
+def environment(mock_get_environ):
+    fake_environ = {}
+    mock_get_environ.side_effect = lambda k, d=None: fake_environ.get(k, d)
+    return fake_environ
 
 
 @pytest.fixture
@@ -42,6 +54,20 @@ def test_get_environ(environment: dict):
     assert auto_config.get_environ("qqq") is None
 
 
+def test_get_environ_reads_a_snapshot(monkeypatch):
+    monkeypatch.setenv("JMULLAN_CMD_TEST", "first")
+    auto_config.refresh_env_cache()
+    assert auto_config.get_environ("JMULLAN_CMD_TEST") == "first"
+    monkeypatch.setenv("JMULLAN_CMD_TEST", "second")
+    assert auto_config.get_environ("JMULLAN_CMD_TEST") == "first"
+    auto_config.refresh_env_cache()
+    assert auto_config.get_environ("JMULLAN_CMD_TEST") == "second"
+    monkeypatch.delenv("JMULLAN_CMD_TEST")
+    auto_config.refresh_env_cache()
+    assert auto_config.get_environ("JMULLAN_CMD_TEST") is auto_config.MISSING
+    assert auto_config.get_environ("JMULLAN_CMD_TEST", "fallback") == "fallback"
+
+
 def test_a_help_formatter_simple():
     parser = argparse.ArgumentParser(
         prog="program",
@@ -189,3 +215,127 @@ options:
 """
     help_text = parser.format_help()
     assert help_text == expected
+
+
+def test_get_terminal_is_cached(environment: dict):
+    environment["TERM"] = "xterm"
+    assert auto_config.get_terminal() == "xterm"
+    environment["TERM"] = "dumb"
+    assert auto_config.get_terminal() == "xterm"
+    auto_config._clear_caches()
+    assert auto_config.get_terminal() == "dumb"
+
+
+def test_stdout_without_isatty_or_encoding():
+    with patch("sys.stdout", object()):
+        assert not auto_config.stdout_is_a_tty()
+        assert not auto_config.stdout_is_utf()
+
+
+def test_fallback_to_env_reads_environment_once(environment: dict, mock_get_environ):
+    environment["FOO_BAR"] = "baz"
+    builder = auto_config.FallbackToEnv("FOO_BAR", fallback="qux", doc="Some foo")
+    assert builder.default == "baz"
+    assert builder.doc() == "Some foo. Defaults to \"$FOO_BAR='baz' or qux\""
+    assert mock_get_environ.call_count == 1
+
+
+def test_fallback_to_env_uses_fallback(environment: dict):
+    builder = auto_config.FallbackToEnv("FOO_BAR", fallback="qux")
+    assert builder.default == "qux"
+    assert builder.arg_name() == "--foo-bar"
+    assert builder.field_name() == "foo_bar"
+
+
+def test_missing_is_a_singleton():
+    assert auto_config._MISSING() is auto_config.MISSING
+    assert not auto_config.MISSING
+
+
+def test_a_help_formatter_colors_dumb_terminal(environment, pretend_stdout_is_a_tty):
+    environment["TERM"] = "dumb"
+    parser = argparse.ArgumentParser(prog="program", formatter_class=auto_config.AHelpFormatter)
+    auto_config.add_color_arguments(parser)
+    help_text = parser.format_help()
+    assert "(Colors currently defaulting to off)" in help_text
+    assert "$TERM=dumb: this TERM disables colors by default" in help_text
+
+
+def test_a_help_formatter_argument(monkeypatch, pretend_stdout_is_a_tty):
+    monkeypatch.delenv("FOOBAR", raising=False)
+    monkeypatch.setenv("FOO_BAR", "first")
+    monkeypatch.setenv("FOO_BAR_BAZ", "second")
+    auto_config.refresh_env_cache()
+    with patch("jmullan.cmd.auto_config.stdout_is_utf", return_value=True):
+        parser = argparse.ArgumentParser(prog="program", formatter_class=auto_config.AHelpFormatter)
+        auto_config.add_argument(parser, "Some foo", "foo-bar", ["FOOBAR", "FOO_BAR", "FOO_BAR_BAZ"], "fallback")
+    expected = """usage: program [-h] [--foo-bar FOO_BAR]
+
+options:
+  -h, --help         show this help message and exit
+  --foo-bar FOO_BAR  Some foo
+                     Env: · $FOOBAR=(not set)
+                          ✓ $FOO_BAR=first
+                          · $FOO_BAR_BAZ=second
+                     default: fallback
+"""
+    assert parser.format_help() == expected
+    assert parser.parse_args([]).foo_bar == "first"
+
+
+def test_env_hint():
+    assert auto_config.env_hint("FOO", None, "$") == "$FOO=(not set)"
+    assert auto_config.env_hint("FOO", auto_config.MISSING) == "FOO=(not set)"
+    assert auto_config.env_hint("FOO", "bar") == "FOO=bar"
+    assert auto_config.env_hint("API_TOKEN", "bar") == "API_TOKEN=*** REDACTED ***"
+    assert auto_config.env_hint("DB_Password", "bar") == "DB_Password=*** REDACTED ***"
+    assert auto_config.env_hint("API_TOKEN", "") == "API_TOKEN="
+
+
+def test_fallback_to_default_doc():
+    assert auto_config.FallbackToDefault("foo_bar", "baz").doc() == "Defaults to 'baz'"
+    assert auto_config.FallbackToDefault("foo_bar", "baz", "  Some foo ").doc() == "Some foo. Defaults to 'baz'"
+    assert auto_config.FallbackToDefault("foo_bar", auto_config.MISSING, "Some foo").doc() == "Some foo."
+    assert auto_config.FallbackToDefault("foo_bar", auto_config.MISSING, None).doc() == ""
+
+
+def test_add_argument_builds_help_lazily(environment: dict):
+    environment["FOO_BAR"] = "baz"
+    parser = argparse.ArgumentParser(prog="program", formatter_class=auto_config.AHelpFormatter)
+    with patch("jmullan.cmd.auto_config.env_hint") as mock_env_hint:
+        mock_env_hint.return_value = "FOO_BAR=baz"
+        auto_config.add_argument(parser, "Some foo", "foo-bar", ["FOO_BAR"])
+        assert parser.parse_args([]).foo_bar == "baz"
+        assert mock_env_hint.call_count == 0
+        assert "FOO_BAR=baz" in parser.format_help()
+        assert mock_env_hint.call_count == 1
+
+
+def test_builders_use_slots():
+    assert not hasattr(auto_config.MISSING, "__dict__")
+    assert not hasattr(auto_config.UseCliColor(), "__dict__")
+    assert not hasattr(auto_config.FallbackToDefault("foo", "bar"), "__dict__")
+    assert not hasattr(auto_config.FallbackToEnv("FOO"), "__dict__")
+
+
+def test_fallback_to_default_names():
+    builder = auto_config.FallbackToDefault("Foo_Bar", "baz")
+    assert builder.arg_name() == "--foo-bar"
+    assert builder.field_name() == "foo_bar"
+    assert builder.arg_name() is builder.arg_name()
+    parser = argparse.ArgumentParser(prog="program")
+    builder.add_to_parser(parser)
+    assert parser.parse_args([]).foo_bar == "baz"
+    assert parser.parse_args(["--foo-bar", "qux"]).foo_bar == "qux"
+
+
+def test_fallback_to_env_named_after_variable_as_attribute(environment: dict):
+    environment["FOO_BAR"] = "baz"
+
+    class Settings:
+        colour = auto_config.FallbackToEnv("FOO_BAR")
+
+    builder = Settings.__dict__["colour"]
+    assert builder.arg_name() == "--foo-bar"
+    assert builder.field_name() == "foo_bar"
+    assert builder.default == "baz"
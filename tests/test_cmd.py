@@ -1,3 +1,14 @@
+import argparse
+import io
+import os
+import re
+import signal
+import threading
+from unittest.mock import patch
+
+import pytest
+import requests
+
 from jmullan.cmd import cmd
 
 
@@ -11,3 +22,430 @@ def test_main():
     test_main = MyMain()
     assert test_main is not None
     test_main.main()
+
+
+def test_get_filenames():
+    assert cmd.get_filenames(argparse.Namespace(filenames=[])) == ["-"]
+    assert cmd.get_filenames(argparse.Namespace(filenames=["b", "-", "a", "b", "-"])) == ["b", "-", "a"]
+
+
+def test_update_in_place_prints_stdin(capsys):
+    cmd.update_in_place("-", str.upper, "abc\n")
+    assert capsys.readouterr().out == "ABC\n"
+
+
+def test_read_file_or_stdin(tmp_path):
+    path = tmp_path / "example.txt"
+    path.write_text("one\r\ntwo\n", encoding="utf-8", newline="")
+    assert cmd.read_file_or_stdin(str(path)) == "one\r\ntwo\n"
+
+
+def test_write_to_stdout(capsys, monkeypatch):
+    cmd.write_to_stdout("héllo\n")
+    assert capsys.readouterr().out == "héllo\n"
+    stdout = io.StringIO()
+    monkeypatch.setattr("sys.stdout", stdout)
+    cmd.write_to_stdout("plain\n")
+    assert stdout.getvalue() == "plain\n"
+
+
+def test_write_local_file(tmp_path):
+    path = tmp_path / "example.txt"
+    path.write_text("something much longer than what replaces it", encoding="utf-8")
+    cmd.write_local_file(str(path), "héllo\r\n")
+    assert path.read_bytes() == "héllo\r\n".encode()
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs named pipes")
+def test_read_local_file_reads_pipes_to_the_end(tmp_path):
+    path = tmp_path / "pipe"
+    os.mkfifo(path)
+    contents = "line\n" * 100_000
+    writer = threading.Thread(target=path.write_text, args=(contents,), kwargs={"encoding": "utf-8"})
+    writer.start()
+    assert cmd.read_local_file(str(path)) == contents
+    writer.join()
+
+
+class UpperLines(cmd.TextIoLineProcessor):
+    def process_line(self, filename: str, line: str) -> tuple[bool, str]:
+        return not line.startswith("#"), line.upper()
+
+
+def test_text_io_line_processor_streams_urls(capsys):
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(b"one\n# skip\ntwo\n")
+    processor = UpperLines()
+    with patch("requests.Session.get", return_value=response):
+        processor.process_filename("https://example.com/")
+    assert capsys.readouterr().out == "ONE\nTWO\n"
+
+
+def test_text_io_processor_opens_urls_ahead(capsys):
+    def fake_get(url, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = io.BytesIO(url.encode() + b"\n")
+        return response
+
+    processor = UpperLines()
+    processor.is_tty = True
+    urls = [f"https://example.com/{i}" for i in range(3)]
+    with patch("requests.Session.get", side_effect=fake_get):
+        processor.process_filenames(urls)
+    assert capsys.readouterr().out == "".join(f"{url.upper()}\n" for url in urls)
+    assert processor._opened_ahead == {}
+
+
+class DirectInitUpperLines(UpperLines):
+    def __init__(self) -> None:
+        cmd.Main.__init__(self)
+
+
+def test_text_io_processor_without_text_io_processor_init(tmp_path, capsys):
+    path = tmp_path / "example.txt"
+    path.write_text("one\n", encoding="utf-8")
+    processor = DirectInitUpperLines()
+    processor.process_filename(str(path))
+    processor.process_filenames([str(path)])
+    assert capsys.readouterr().out == "ONE\nONE\n"
+
+
+def test_text_io_line_processor_batches_output(capsys):
+    processor = UpperLines()
+    processor.is_tty = False
+    processor.output_batch_size = 4
+    processor.process_file_handle("-", io.StringIO("one\n# skip\ntwo\nthree\n"))
+    assert capsys.readouterr().out == "ONE\nTWO\nTHREE\n"
+
+
+class FailingLines(cmd.TextIoLineProcessor):
+    def process_line(self, filename: str, line: str) -> tuple[bool, str]:
+        if line == "boom\n":
+            raise ValueError(line)
+        return True, line
+
+
+def test_text_io_line_processor_writes_batch_on_error(capsys):
+    processor = FailingLines()
+    processor.is_tty = False
+    with pytest.raises(ValueError, match="boom"):
+        processor.process_file_handle("-", io.StringIO("one\ntwo\nboom\n"))
+    assert capsys.readouterr().out == "one\ntwo\n"
+
+
+def test_text_io_line_processor_does_not_repeat_a_failed_write(monkeypatch):
+    written = []
+
+    def failing_writelines(batch):
+        written.append(list(batch))
+        raise BrokenPipeError
+
+    monkeypatch.setattr("sys.stdout.writelines", failing_writelines)
+    processor = UpperLines()
+    processor.is_tty = False
+    processor.output_batch_size = 4
+    with pytest.raises(BrokenPipeError):
+        processor.process_file_handle("-", io.StringIO("one\ntwo\n"))
+    assert written == [["ONE\n"]]
+
+
+def test_text_io_line_processor_writes_lines_to_a_tty(capsys):
+    processor = UpperLines()
+    processor.is_tty = True
+    processor.process_file_handle("-", io.StringIO("one\n# skip\ntwo\n"))
+    assert capsys.readouterr().out == "ONE\nTWO\n"
+
+
+class GrepBytes(cmd.BytesIoLineProcessor):
+    def process_line(self, filename: str, line: bytes) -> tuple[bool, bytes]:
+        return b"o" in line, line
+
+
+def test_bytes_io_line_processor_without_a_binary_stdout(monkeypatch):
+    stdout = io.StringIO()
+    monkeypatch.setattr("sys.stdout", stdout)
+    processor = GrepBytes()
+    processor.is_tty = False
+    processor.process_file_handle("-", io.BytesIO("one\ntwo\nthree\nföo\n".encode()))
+    assert stdout.getvalue() == "one\ntwo\nföo\n"
+
+
+def test_bytes_io_line_processor(tmp_path, capsys):
+    path = tmp_path / "example.txt"
+    path.write_bytes(b"one\ntwo\nthree\n\xff\n")
+    for is_tty, batch_size in ((False, 4), (True, 4)):
+        processor = GrepBytes()
+        processor.is_tty = is_tty
+        processor.output_batch_size = batch_size
+        processor.process_filename(str(path))
+        assert capsys.readouterr().out == "one\ntwo\n"
+
+
+class ErrorsAndWarnings(cmd.RegexLineProcessor):
+    patterns = (r"^ERROR\b", "warn(ing)?:")
+
+
+def test_regex_line_processor(capsys):
+    processor = ErrorsAndWarnings()
+    processor.process_file_handle("-", io.StringIO("ERROR one\nno ERROR\nwarn: two\nwarning: three\nfine\n"))
+    assert capsys.readouterr().out == "ERROR one\nwarn: two\nwarning: three\n"
+
+
+def test_compile_any():
+    assert cmd.compile_any([r"(a)\1", r"(b)\1"])("xbb")
+    assert not cmd.compile_any([r"(a)\1", r"(b)\1"])("ab")
+    assert cmd.compile_any([r"(?P<x>a)", r"(?P<x>b)"])("b")
+    assert cmd.compile_any(["a", "(?i)b"])("B")
+    assert not cmd.compile_any(["a", "(?i)b"])("A")
+    assert cmd.compile_any(["a # letter a", "b"], re.VERBOSE)("b")
+    assert cmd.compile_any(["a", "b"])("b")
+    assert not cmd.compile_any(["a", "b"])("c")
+
+
+def test_regex_line_processor_needs_patterns():
+    class NoPatterns(cmd.RegexLineProcessor):
+        pass
+
+    with pytest.raises(ValueError, match="NoPatterns"):
+        NoPatterns()
+
+
+class Reverser(cmd.InPlaceFileProcessor):
+    def process_contents(self, contents: str) -> str:
+        return contents[::-1]
+
+
+class Printer(cmd.PrintingFileProcessor):
+    def __init__(self) -> None:
+        super().__init__()
+        self.seen: list[str] = []
+
+    def process_contents(self, contents: str) -> str:
+        self.seen.append(contents)
+        return contents
+
+
+def test_add_jobs_argument_leaves_short_options_alone():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-j", dest="json", action="store_true")
+    cmd.add_jobs_argument(parser)
+    args = parser.parse_args(["-j", "--jobs", "3"])
+    assert args.json
+    assert args.jobs == 3
+
+
+def test_only_in_place_processors_run_in_parallel():
+    assert hasattr(Reverser, "process_filenames_in_parallel")
+    assert not hasattr(UpperLines, "process_filenames_in_parallel")
+    assert not hasattr(cmd.PrintingFileProcessor, "process_filenames_in_parallel")
+
+
+def test_process_filenames_in_parallel(tmp_path):
+    paths = [tmp_path / f"{i}.txt" for i in range(4)]
+    for i, path in enumerate(paths):
+        path.write_text(f"abc{i}", encoding="utf-8")
+    processor = Reverser()
+    processor.process_filenames_in_parallel([str(path) for path in paths], 2)
+    assert [path.read_text(encoding="utf-8") for path in paths] == [f"{i}cba" for i in range(4)]
+
+
+def test_contents_processor_reads_ahead(tmp_path):
+    paths = [tmp_path / f"{i}.txt" for i in range(3)]
+    for i, path in enumerate(paths):
+        path.write_text(f"abc{i}", encoding="utf-8")
+    processor = Reverser()
+    processor.process_filenames([str(path) for path in paths])
+    assert [path.read_text(encoding="utf-8") for path in paths] == ["0cba", "1cba", "2cba"]
+    assert processor._read_ahead == {}
+
+
+def test_contents_processor_reads_urls_ahead(monkeypatch):
+    fetched = []
+
+    def fake_read(filename):
+        fetched.append(filename)
+        return filename
+
+    monkeypatch.setattr(cmd, "read_file_or_stdin", fake_read)
+    urls = [f"https://example.com/{i}" for i in range(3)]
+    processor = Printer()
+    processor.process_filenames(urls)
+    assert sorted(fetched) == urls
+    assert processor.seen == urls
+
+
+class DirectInitReverser(Reverser):
+    def __init__(self) -> None:
+        cmd.Main.__init__(self)
+
+
+def test_contents_processor_without_contents_processor_init(tmp_path):
+    path = tmp_path / "example.txt"
+    path.write_text("abc", encoding="utf-8")
+    processor = DirectInitReverser()
+    processor.process_filename(str(path))
+    assert path.read_text(encoding="utf-8") == "cba"
+    processor.process_filenames([str(path)])
+    assert path.read_text(encoding="utf-8") == "abc"
+
+
+def test_contents_processor_without_read_ahead(tmp_path):
+    path = tmp_path / "example.txt"
+    path.write_text("abc", encoding="utf-8")
+    processor = Reverser()
+    processor.read_ahead = 0
+    processor.process_filenames([str(path)])
+    assert path.read_text(encoding="utf-8") == "cba"
+
+
+class LineStripper(cmd.InPlaceFileProcessor):
+    def process_contents(self, contents: str) -> str:
+        raise AssertionError
+
+    def process_contents_streaming(self, handle):
+        return (line.rstrip(" \n") + "\n" for line in handle)
+
+
+def test_in_place_without_streaming_does_not_stream(tmp_path, monkeypatch):
+    def fail(*args):
+        raise AssertionError(args)
+
+    monkeypatch.setattr(cmd, "update_in_place_streaming", fail)
+    path = tmp_path / "example.txt"
+    path.write_text("abc", encoding="utf-8")
+    processor = Reverser()
+    processor.read_ahead = 0
+    processor.process_filenames([str(path)])
+    assert path.read_text(encoding="utf-8") == "cba"
+
+
+def test_in_place_streaming(tmp_path, monkeypatch):
+    changed = tmp_path / "changed.txt"
+    changed.write_text("one  \ntwo\n", encoding="utf-8")
+    unchanged = tmp_path / "unchanged.txt"
+    unchanged.write_text("one\ntwo\n", encoding="utf-8")
+    written = []
+    write = cmd.write_to_file_or_stdout
+
+    def record_write(filename, contents):
+        written.append(filename)
+        write(filename, contents)
+
+    monkeypatch.setattr(cmd, "write_to_file_or_stdout", record_write)
+    processor = LineStripper()
+    processor.process_filenames([str(changed), str(unchanged)])
+    assert changed.read_text(encoding="utf-8") == "one\ntwo\n"
+    assert unchanged.read_text(encoding="utf-8") == "one\ntwo\n"
+    assert written == [str(changed)]
+
+
+class CountingLineStripper(LineStripper):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    def process_contents_streaming(self, handle):
+        self.calls += 1
+        return super().process_contents_streaming(handle)
+
+    def unchanged_cache_key(self) -> str | None:
+        return "line stripper 1"
+
+
+def test_in_place_streaming_skips_cached_unchanged_files(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    path = tmp_path / "example.txt"
+    path.write_text("one\ntwo\n", encoding="utf-8")
+    processor = CountingLineStripper()
+    processor.process_filenames([str(path)])
+    assert processor.calls == 1
+    processor.process_filenames([str(path)])
+    assert processor.calls == 1
+    path.write_text("one  \ntwo\n", encoding="utf-8")
+    processor.process_filenames([str(path)])
+    assert processor.calls == 3
+    assert path.read_text(encoding="utf-8") == "one\ntwo\n"
+
+
+class CountingReverser(Reverser):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    def process_contents(self, contents: str) -> str:
+        self.calls += 1
+        return super().process_contents(contents)
+
+    def unchanged_cache_key(self) -> str | None:
+        return "reverser 1"
+
+
+def test_in_place_skips_cached_unchanged_contents(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    path = tmp_path / "example.txt"
+    path.write_text("abba", encoding="utf-8")
+    processor = CountingReverser()
+    processor.read_ahead = 0
+    processor.process_filenames([str(path), str(path)])
+    assert processor.calls == 1
+    assert path.read_text(encoding="utf-8") == "abba"
+    path.write_text("abc", encoding="utf-8")
+    processor.process_filenames([str(path)])
+    assert processor.calls == 2
+    assert path.read_text(encoding="utf-8") == "cba"
+
+
+def test_find_command_help_is_cached_per_class():
+    cmd.find_class_help.cache_clear()
+    first = MyMain()
+    second = MyMain()
+    assert cmd.find_command_help(first) == cmd.find_command_help(second)
+    assert cmd.find_class_help.cache_info().hits >= 1
+
+
+def test_handle_signal_clears_go():
+    try:
+        assert cmd.Jmullan.GO is True
+        cmd.handle_signal(2, None)
+        assert cmd.Jmullan.GO is False
+    finally:
+        cmd.Jmullan.GO = True
+
+
+def test_assigning_go_stops_processing(tmp_path, capsys):
+    paths = [tmp_path / f"{i}.txt" for i in range(3)]
+    for path in paths:
+        path.write_text(f"{path.name}\n", encoding="utf-8")
+
+    class StopAfterFirst(UpperLines):
+        def process_line(self, filename: str, line: str) -> tuple[bool, str]:
+            cmd.Jmullan.GO = False
+            return super().process_line(filename, line)
+
+    try:
+        StopAfterFirst().process_filenames([str(path) for path in paths])
+    finally:
+        cmd.Jmullan.GO = True
+    assert capsys.readouterr().out == "0.TXT\n"
+    assert cmd.Jmullan.GO
+
+
+def test_install_signal_handler_only_installs_once(monkeypatch):
+    original = signal.getsignal(signal.SIGINT)
+    installed = []
+
+    def record_signal(signum, handler):
+        installed.append(signum)
+        return signal_signal(signum, handler)
+
+    signal_signal = signal.signal
+    monkeypatch.setattr(signal, "signal", record_signal)
+    try:
+        signal_signal(signal.SIGINT, signal.default_int_handler)
+        cmd.handle_keyboard_interrupt()
+        cmd.handle_keyboard_interrupt()
+        assert installed == [signal.SIGINT]
+    finally:
+        signal_signal(signal.SIGINT, original)
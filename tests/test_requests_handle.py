@@ -0,0 +1,86 @@
+import io
+from unittest.mock import patch
+
+import requests
+
+from jmullan.cmd import requests_handle
+
+
+def fake_response(body: bytes, encoding: str | None = "utf-8") -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(body)
+    response.encoding = encoding
+    return response
+
+
+def test_read_everything():
+    with patch("requests.Session.get", return_value=fake_response("héllo\nworld\n".encode())):
+        handle = requests_handle.RequestsHandle("https://example.com/")
+        assert handle.read() == "héllo\nworld\n"
+        assert not handle.readable()
+        assert handle.getvalue() == "héllo\nworld\n"
+
+
+def test_read_with_an_unknown_encoding():
+    for size in (None, 2):
+        with patch("requests.Session.get", return_value=fake_response("héllo\n".encode(), encoding="x-nonsense")):
+            handle = requests_handle.RequestsHandle("https://example.com/")
+            assert handle.read(size) == "héllo\n"
+
+
+def test_read_in_chunks_without_an_encoding():
+    with patch("requests.Session.get", return_value=fake_response("héllo\nworld\n".encode(), encoding=None)):
+        handle = requests_handle.RequestsHandle("https://example.com/")
+        assert handle.read(2) == "héllo\nworld\n"
+
+
+def test_open_raw():
+    with (
+        patch("requests.Session.get", return_value=fake_response(b"one\ntwo\n")),
+        requests_handle.open_raw("https://example.com/") as handle,
+    ):
+        assert list(handle) == [b"one\n", b"two\n"]
+
+
+def test_chunk_size_from_env(monkeypatch):
+    monkeypatch.setenv("JMULLAN_HTTP_CHUNK", "1048576")
+    assert requests_handle._chunk_size_from_env(10) == 1048576
+    monkeypatch.setenv("JMULLAN_HTTP_CHUNK", "lots")
+    assert requests_handle._chunk_size_from_env(10) == 10
+
+
+def test_close_only_closes_once():
+    response = fake_response(b"")
+    with patch("requests.Session.get", return_value=response), patch.object(response, "close") as close:
+        with requests_handle.RequestsHandle("https://example.com/") as handle:
+            handle.close()
+        close.assert_called_once_with()
+
+
+def test_session_is_shared():
+    session = requests_handle.get_session()
+    assert requests_handle.get_session() is session
+    assert session.get_adapter("https://example.com/") is session.get_adapter("http://example.com/")
+
+
+def test_iterate_lines():
+    with patch("requests.Session.get", return_value=fake_response("one\r\ntwö\n\nthree".encode())):
+        handle = requests_handle.RequestsHandle("https://example.com/")
+        assert list(handle) == ["one\r\n", "twö\n", "\n", "three"]
+        assert not handle.readable()
+
+
+def test_iterate_lines_across_chunks(monkeypatch):
+    monkeypatch.setattr(requests_handle, "MIN_CHUNK_SIZE", 3)
+    body = "a long first line\nb\n\nc d e f g h\nend"
+    with patch("requests.Session.get", return_value=fake_response(body.encode())):
+        handle = requests_handle.RequestsHandle("https://example.com/")
+        assert list(handle) == ["a long first line\n", "b\n", "\n", "c d e f g h\n", "end"]
+
+
+def test_default_timeout():
+    with patch("requests.Session.get", return_value=fake_response(b"")) as get:
+        requests_handle.RequestsHandle("https://example.com/")
+        requests_handle.RequestsHandle("https://example.com/", timeout=1)
+    assert [call.kwargs["timeout"] for call in get.call_args_list] == [requests_handle.DEFAULT_TIMEOUT, 1]